@@ -5,6 +5,10 @@ from asgiref.sync import sync_to_async
 from .models import JapaneseSentence
 
 
+def random_sentence(used_questions):
+    return JapaneseSentence.objects.exclude(id__in=used_questions).order_by('?').first()
+
+
 class GameConsumer(AsyncWebsocketConsumer):
     game_state = {}
 
@@ -121,7 +125,7 @@ class GameConsumer(AsyncWebsocketConsumer):
 
     @sync_to_async
     def get_random_sentence(self, used_questions):
-        return JapaneseSentence.objects.exclude(id__in=used_questions).order_by('?').first()
+        return random_sentence(used_questions)
 
     async def start_new_round(self):
         room = self.game_state[self.room_group_name]
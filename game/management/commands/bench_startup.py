@@ -0,0 +1,119 @@
+import json
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from game.models import GameRoom, JapaneseSentence
+
+
+# Runs in a fresh interpreter: boots the ASGI app, optionally warms it up,
+# then serves the first room (page render, WebSocket connect, first question)
+# and prints the timings as JSON.
+CHILD_SCRIPT = """
+import asyncio, json, sys, time
+
+start = time.perf_counter()
+import myproject.asgi as asgi
+booted = time.perf_counter()
+
+from asgiref.sync import sync_to_async
+from channels.testing import HttpCommunicator, WebsocketCommunicator
+from game import startup
+harness_loaded = time.perf_counter()
+
+async def main(room_code, warm):
+    warmed = harness_loaded
+    application = asgi.application
+    if warm:
+        await startup.start_warm_up()
+        warmed = time.perf_counter()
+    else:
+        # Keep the first room from kicking off warm-up alongside itself.
+        application = startup.WarmUpApplication(asgi.application.application, auto_warm_up=False)
+
+    response = await HttpCommunicator(application, 'GET', f'/game/{room_code}/').get_response()
+    assert response['status'] == 200, response['status']
+    socket = WebsocketCommunicator(application, f'/ws/game/{room_code}/')
+    connected, _ = await socket.connect()
+    assert connected
+    from game.consumers import random_sentence
+    await sync_to_async(random_sentence)([])
+    served = time.perf_counter()
+    await socket.disconnect()
+    return warmed, served
+
+warmed, served = asyncio.run(main(sys.argv[1], sys.argv[2] == 'warm'))
+print(json.dumps({
+    'boot_ms': (booted - start) * 1000,
+    'warm_up_ms': (warmed - harness_loaded) * 1000,
+    'first_room_ms': (served - warmed) * 1000,
+}))
+"""
+
+
+class Command(BaseCommand):
+    help = (
+        "Prints the slowest imports of myproject.asgi (python -X importtime) "
+        "and measures time-to-first-served-room in fresh worker processes, "
+        "with and without the warm-up stage."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=5)
+        parser.add_argument('--top', type=int, default=15,
+                            help="Number of imports to list, by cumulative time.")
+
+    def handle(self, *args, **options):
+        self.import_profile(options['top'])
+
+        if not JapaneseSentence.objects.exists():
+            raise CommandError("No JapaneseSentence rows, add some questions first.")
+
+        room = GameRoom.objects.create()
+        try:
+            self.stdout.write('')
+            self.stdout.write(f"{'worker':<8}{'boot ms':>10}{'warm-up ms':>12}{'first room ms':>15}{'total ms':>10}")
+            for mode in ('cold', 'warm'):
+                runs = [self.run_child(str(room.room_code), mode) for _ in range(options['runs'])]
+                boot, warm_up, first_room = (
+                    statistics.median(run[key] for run in runs)
+                    for key in ('boot_ms', 'warm_up_ms', 'first_room_ms')
+                )
+                self.stdout.write(
+                    f"{mode:<8}{boot:>10.1f}{warm_up:>12.1f}{first_room:>15.1f}"
+                    f"{boot + warm_up + first_room:>10.1f}"
+                )
+        finally:
+            room.delete()
+
+    def import_profile(self, top):
+        result = subprocess.run(
+            [sys.executable, '-X', 'importtime', '-c', 'import myproject.asgi'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+        )
+        if result.returncode:
+            raise CommandError(result.stderr)
+
+        imports = []
+        for line in result.stderr.splitlines():
+            if not line.startswith('import time:') or 'cumulative' in line:
+                continue
+            # import time: self [us] | cumulative | imported package
+            _, cumulative_us, name = line[len('import time:'):].split('|')
+            imports.append((int(cumulative_us), name.strip()))
+
+        self.stdout.write(f"{'cumulative ms':>14}  module")
+        for cumulative_us, name in sorted(imports, reverse=True)[:top]:
+            self.stdout.write(f"{cumulative_us / 1000:>14.1f}  {name}")
+
+    def run_child(self, room_code, mode):
+        result = subprocess.run(
+            [sys.executable, '-c', CHILD_SCRIPT, room_code, mode],
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+        )
+        if result.returncode:
+            raise CommandError(result.stderr)
+        return json.loads(result.stdout.splitlines()[-1])
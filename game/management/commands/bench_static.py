@@ -0,0 +1,156 @@
+import asyncio
+import re
+import time
+
+from django.core.asgi import get_asgi_application
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import override_settings
+from django.urls import reverse
+
+from game.models import GameRoom
+from game.staticfiles import StaticFilesApplication
+
+
+STYLESHEET_RE = re.compile(r'<link rel="stylesheet" href="(/static/[^"]+)"')
+
+CLIENTS = {
+    'identity': {'accept-encoding': ''},
+    'gzip': {'accept-encoding': 'gzip, deflate'},
+    'br': {'accept-encoding': 'gzip, deflate, br'},
+}
+
+
+async def fetch(app, path, headers=None):
+    """
+    Runs a single GET through the ASGI app and returns (status, headers, body).
+    """
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': path,
+        'raw_path': path.encode(),
+        'query_string': b'',
+        'root_path': '',
+        'headers': [(b'host', b'localhost')] + [
+            (key.encode(), value.encode()) for key, value in (headers or {}).items()
+        ],
+        'server': ('localhost', 8000),
+        'client': ('127.0.0.1', 50000),
+    }
+    response = {'body': b''}
+    requested = False
+    finished = asyncio.Event()
+
+    async def receive():
+        nonlocal requested
+        if not requested:
+            requested = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await finished.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message):
+        if message['type'] == 'http.response.start':
+            response['status'] = message['status']
+            response['headers'] = {key.decode(): value.decode() for key, value in message['headers']}
+        else:
+            response['body'] += message.get('body', b'')
+
+    await app(scope, receive, send)
+    finished.set()
+    return response['status'], response['headers'], response['body']
+
+
+class Command(BaseCommand):
+    help = (
+        "Measures bytes on the wire and time-to-first-render of the room page "
+        "(HTML plus render-blocking stylesheets) as served by the ASGI app. "
+        "Run collectstatic first."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--runs', type=int, default=50)
+        parser.add_argument('--bandwidth-kbps', type=float, default=1600,
+                            help="Simulated downlink used to turn bytes into transfer time.")
+        parser.add_argument('--rtt-ms', type=float, default=150,
+                            help="Simulated round trip time per request.")
+
+    def handle(self, *args, **options):
+        app = StaticFilesApplication(get_asgi_application())
+        if not app.files:
+            raise CommandError("No collected static files found, run collectstatic first.")
+
+        room = GameRoom.objects.create()
+        try:
+            # Render URLs the way production does: hashed names from the manifest.
+            with override_settings(DEBUG=False):
+                path = reverse('game_room', kwargs={'room_code': room.room_code})
+                rows = asyncio.run(self.measure(app, path, options))
+        finally:
+            room.delete()
+
+        self.stdout.write(f"{'client':<10}{'visit':<8}{'requests':>9}{'bytes':>9}{'server ms':>11}{'est. render ms':>16}")
+        for row in rows:
+            self.stdout.write(
+                f"{row['client']:<10}{row['visit']:<8}{row['requests']:>9}{row['bytes']:>9}"
+                f"{row['server_ms']:>11.2f}{row['render_ms']:>16.1f}"
+            )
+
+        asset = app.files.get('game/image1.png')
+        if asset is not None:
+            self.stdout.write('')
+            self.stdout.write(f"{'login background image':<28}{'bytes':>9}")
+            self.stdout.write(f"{'png':<28}{asset.identity.size:>9}")
+            if 'webp' in asset.variants:
+                self.stdout.write(f"{'webp':<28}{asset.variants['webp'].size:>9}")
+            else:
+                self.stdout.write(f"{'webp':<28}{'no variant':>9}")
+
+    async def measure(self, app, path, options):
+        rows = []
+        for client, headers in CLIENTS.items():
+            for visit in ('first', 'repeat'):
+                best = None
+                for _ in range(options['runs']):
+                    result = await self.load_room(app, path, headers, repeat=(visit == 'repeat'))
+                    if best is None or result['server_ms'] < best['server_ms']:
+                        best = result
+                transfer_ms = best['bytes'] * 8 / options['bandwidth_kbps']
+                best.update(
+                    client=client,
+                    visit=visit,
+                    render_ms=best['server_ms'] + transfer_ms + best['requests'] * options['rtt_ms'],
+                )
+                rows.append(best)
+        return rows
+
+    async def load_room(self, app, path, headers, repeat):
+        """
+        Fetches the room page and the stylesheets that block its first render.
+
+        On a repeat visit immutable stylesheets come straight from the browser
+        cache, anything else is revalidated with If-None-Match.
+        """
+        start = time.perf_counter()
+        status, _, html = await fetch(app, path, headers)
+        if status != 200:
+            raise CommandError(f"{path} returned {status}")
+        requests, wire_bytes = 1, len(html)
+
+        for href in STYLESHEET_RE.findall(html.decode()):
+            _, response_headers, body = await fetch(app, href, headers)
+            if repeat:
+                if 'immutable' in response_headers.get('cache-control', ''):
+                    continue
+                _, _, body = await fetch(app, href, dict(headers, **{'if-none-match': response_headers['etag']}))
+            requests += 1
+            wire_bytes += len(body)
+
+        return {
+            'requests': requests,
+            'bytes': wire_bytes,
+            'server_ms': (time.perf_counter() - start) * 1000,
+        }
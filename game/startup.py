@@ -0,0 +1,129 @@
+import asyncio
+import logging
+import threading
+import time
+
+from asgiref.sync import sync_to_async
+from django.db import connections
+from django.template.loader import get_template
+
+logger = logging.getLogger(__name__)
+
+# Templates compiled during warm-up so the first visitor doesn't pay for it.
+WARM_UP_TEMPLATES = [
+    'game/base.html',
+    'game/home.html',
+    'game/room.html',
+]
+
+_lazy_applications = []
+_warm_up_task = None
+_ready = False
+
+
+class LazyApplication:
+    """
+    ASGI application that builds the wrapped application on first use, or
+    during warm-up, whichever comes first.
+    """
+
+    def __init__(self, factory):
+        self.factory = factory
+        self.application = None
+        self._lock = threading.Lock()
+        _lazy_applications.append(self)
+
+    def load(self):
+        with self._lock:
+            if self.application is None:
+                self.application = self.factory()
+        return self.application
+
+    async def __call__(self, scope, receive, send):
+        application = self.application
+        if application is None:
+            # Build (or wait for warm-up to finish building) off the event
+            # loop, so other connections keep being served meanwhile.
+            application = await sync_to_async(self.load, thread_sensitive=False)()
+        return await application(scope, receive, send)
+
+
+class WarmUpApplication:
+    """
+    Outermost ASGI application: starts warm-up on lifespan startup, or on the
+    first incoming connection for servers that don't send lifespan events
+    (Daphne), and passes everything else through.
+
+    Pass auto_warm_up=False to only warm up on lifespan startup.
+    """
+
+    def __init__(self, application, auto_warm_up=True):
+        self.application = application
+        self.auto_warm_up = auto_warm_up
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            while True:
+                message = await receive()
+                if message['type'] == 'lifespan.startup':
+                    await start_warm_up()
+                    await send({'type': 'lifespan.startup.complete'})
+                elif message['type'] == 'lifespan.shutdown':
+                    await send({'type': 'lifespan.shutdown.complete'})
+                    return
+
+        if self.auto_warm_up:
+            start_warm_up()
+        return await self.application(scope, receive, send)
+
+
+def warm_up():
+    """
+    Does the work the first room in a fresh worker would otherwise pay for:
+    building the WebSocket stack, running the question query and compiling
+    templates.
+    """
+    for application in _lazy_applications:
+        application.load()
+
+    from .consumers import random_sentence
+
+    for connection in connections.all():
+        connection.ensure_connection()
+    random_sentence([])
+
+    for template_name in WARM_UP_TEMPLATES:
+        get_template(template_name)
+
+
+def start_warm_up():
+    """
+    Schedules warm-up once per process and returns the task.
+
+    Warm-up runs through sync_to_async, the same way GameConsumer queries the
+    database, so the connection it opens is the one the consumer reuses.
+    Django views get a fresh thread per request under ASGI and open their own
+    connection; for them warm-up only saves import and template compile time.
+    """
+    global _warm_up_task
+    if _warm_up_task is None:
+        _warm_up_task = asyncio.ensure_future(_run_warm_up())
+    return _warm_up_task
+
+
+async def _run_warm_up():
+    global _ready, _warm_up_task
+    start = time.perf_counter()
+    try:
+        await sync_to_async(warm_up)()
+    except Exception:
+        # Stay not-ready and retry on the next connection.
+        logger.exception("Warm-up failed")
+        _warm_up_task = None
+        return
+    _ready = True
+    logger.info("Warm-up finished in %.1f ms", (time.perf_counter() - start) * 1000)
+
+
+def is_ready():
+    return _ready
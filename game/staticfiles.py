@@ -0,0 +1,378 @@
+import gzip
+import json
+import mimetypes
+import os
+import re
+from collections import namedtuple
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, gzip variants are always built
+    brotli = None
+
+try:
+    from PIL import Image
+except ImportError:  # Pillow is optional, images are then served as-is
+    Image = None
+
+
+COMPRESSIBLE_EXTENSIONS = ('.css', '.js', '.html', '.svg', '.json', '.txt', '.map')
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg')
+
+# Suffix appended to a collected file for each precompressed / optimized variant.
+VARIANT_SUFFIXES = {
+    'br': '.br',
+    'gzip': '.gz',
+    'webp': '.webp',
+}
+
+IMMUTABLE_CACHE_CONTROL = 'public, max-age=31536000, immutable'
+REVALIDATE_CACHE_CONTROL = 'no-cache'
+CHUNK_SIZE = 64 * 1024
+
+RANGE_RE = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """
+    Manifest storage that also writes .gz/.br copies of text assets and a
+    .webp copy of raster images during collectstatic.
+
+    A variant is only kept when it is actually smaller than the original.
+    Files missing from the manifest fall back to their unhashed name, so
+    templates still render (e.g. in tests) before collectstatic has run.
+    """
+    manifest_strict = False
+
+    def stored_name(self, name):
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            # Not collected into STATIC_ROOT yet, link the unhashed name.
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        collected = set()
+        for name, hashed_name, processed in super().post_process(paths, dry_run=dry_run, **options):
+            if not isinstance(processed, Exception):
+                collected.add(name)
+                if hashed_name:
+                    collected.add(hashed_name)
+            yield name, hashed_name, processed
+
+        if dry_run:
+            return
+
+        for name in sorted(collected):
+            for variant in self.build_variants(name):
+                yield name, variant, True
+
+    def build_variants(self, name):
+        """
+        Writes the variants of a single collected file and returns their names.
+        """
+        path = self.path(name)
+        lower_name = name.lower()
+        if lower_name.endswith(COMPRESSIBLE_EXTENSIONS):
+            with open(path, 'rb') as f:
+                content = f.read()
+            variants = {'gzip': gzip.compress(content, compresslevel=9, mtime=0)}
+            if brotli is not None:
+                variants['br'] = brotli.compress(content, quality=11)
+            written = []
+            for kind in ('gzip', 'br'):
+                data = variants.get(kind)
+                if data is not None and len(data) < len(content):
+                    written.append(self._write_variant(name, kind, data))
+                else:
+                    # Don't leave a variant from an earlier run next to new content.
+                    self._remove_variant(name, kind)
+            return written
+
+        if lower_name.endswith(IMAGE_EXTENSIONS) and Image is not None:
+            webp_path = path + VARIANT_SUFFIXES['webp']
+            try:
+                with Image.open(path) as image:
+                    image.save(webp_path, 'WEBP', quality=80, method=6)
+            except OSError:
+                # Not a decodable image, serve the original only.
+                self._remove_variant(name, 'webp')
+                return []
+            if os.path.getsize(webp_path) < os.path.getsize(path):
+                return [name + VARIANT_SUFFIXES['webp']]
+            self._remove_variant(name, 'webp')
+        elif lower_name.endswith(IMAGE_EXTENSIONS):
+            self._remove_variant(name, 'webp')
+        return []
+
+    def _remove_variant(self, name, kind):
+        variant_path = self.path(name + VARIANT_SUFFIXES[kind])
+        if os.path.exists(variant_path):
+            os.remove(variant_path)
+
+    def _write_variant(self, name, kind, data):
+        variant_name = name + VARIANT_SUFFIXES[kind]
+        with open(self.path(variant_name), 'wb') as f:
+            f.write(data)
+        return variant_name
+
+
+def parse_qvalues(header):
+    """
+    Parses an Accept or Accept-Encoding header into {token: q}.
+    """
+    qvalues = {}
+    for item in header.split(','):
+        token, *params = [part.strip() for part in item.split(';')]
+        if not token:
+            continue
+        q = 1.0
+        for param in params:
+            key, _, value = param.partition('=')
+            if key.strip().lower() == 'q':
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qvalues[token.lower()] = q
+    return qvalues
+
+
+def media_type_q(qvalues, media_type):
+    """
+    Returns the q-value of a media type, falling back to type/* and */*.
+    """
+    for token in (media_type, media_type.split('/')[0] + '/*', '*/*'):
+        if token in qvalues:
+            return qvalues[token]
+    return 0
+
+
+def etag_matches(etag, if_none_match):
+    """
+    Weak comparison of an ETag against an If-None-Match header.
+    """
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == '*' or candidate == etag:
+            return True
+    return False
+
+
+Representation = namedtuple('Representation', 'path size etag content_type encoding')
+
+
+class StaticAsset:
+    """
+    A collected file and the variants that can be served in its place.
+    """
+
+    def __init__(self, path, immutable):
+        content_type, _ = mimetypes.guess_type(path)
+        self.identity = self._representation(path, content_type or 'application/octet-stream')
+        self.cache_control = IMMUTABLE_CACHE_CONTROL if immutable else REVALIDATE_CACHE_CONTROL
+        self.variants = {}
+
+    @staticmethod
+    def _representation(path, content_type, encoding=None):
+        stat = os.stat(path)
+        etag = f'"{stat.st_size:x}-{stat.st_mtime_ns:x}"'
+        return Representation(path, stat.st_size, etag, content_type, encoding)
+
+    def add_variant(self, kind, path):
+        if kind == 'webp':
+            self.variants[kind] = self._representation(path, 'image/webp')
+        else:
+            self.variants[kind] = self._representation(path, self.identity.content_type, kind)
+
+    @property
+    def vary(self):
+        vary = []
+        if 'br' in self.variants or 'gzip' in self.variants:
+            vary.append('Accept-Encoding')
+        if 'webp' in self.variants:
+            vary.append('Accept')
+        return ', '.join(vary)
+
+    def select(self, accept, accept_encoding):
+        """
+        Picks the representation with the highest q-value the client gave,
+        preferring the smaller variant on a tie. Anything with q=0 is refused.
+        """
+        if 'webp' in self.variants:
+            media_types = parse_qvalues(accept)
+            webp_q = media_type_q(media_types, 'image/webp')
+            if webp_q > 0 and webp_q >= media_type_q(media_types, self.identity.content_type):
+                return self.variants['webp']
+        encodings = parse_qvalues(accept_encoding)
+        best, best_q = self.identity, 0
+        for kind in ('br', 'gzip'):
+            q = encodings.get(kind, encodings.get('*', 0))
+            if kind in self.variants and q > best_q:
+                best, best_q = self.variants[kind], q
+        return best
+
+
+class StaticFilesApplication:
+    """
+    ASGI application that serves STATIC_ROOT in front of another application.
+
+    Files listed in the collectstatic manifest are content-hashed and sent with
+    immutable cache headers, everything else is revalidated via ETag. Clients
+    get the brotli/gzip/webp variant they accept, and single byte ranges are
+    honoured on the uncompressed file. Requests for anything that was not
+    collected fall through to the wrapped application.
+
+    STATIC_ROOT is scanned once at startup, so workers must be restarted
+    after running collectstatic.
+    """
+
+    def __init__(self, application, root=None, prefix=None):
+        self.application = application
+        self.root = str(root or settings.STATIC_ROOT or '')
+        self.prefix = prefix or settings.STATIC_URL
+        self.files = self.scan()
+
+    def scan(self):
+        if not self.root or not os.path.isdir(self.root):
+            return {}
+
+        names = set()
+        for directory, _, filenames in os.walk(self.root):
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                names.add(os.path.relpath(path, self.root).replace(os.sep, '/'))
+
+        manifest_name = ManifestStaticFilesStorage.manifest_name
+        immutable = set()
+        if manifest_name in names:
+            with open(os.path.join(self.root, manifest_name)) as f:
+                immutable = set(json.load(f).get('paths', {}).values())
+
+        variants = {}
+        for name in names:
+            for kind, suffix in VARIANT_SUFFIXES.items():
+                if name.endswith(suffix) and name[:-len(suffix)] in names:
+                    variants[name] = (name[:-len(suffix)], kind)
+
+        files = {}
+        for name in names:
+            if name in variants or name == manifest_name:
+                continue
+            files[name] = StaticAsset(os.path.join(self.root, name), name in immutable)
+        for name, (original, kind) in variants.items():
+            if original in files:
+                files[original].add_variant(kind, os.path.join(self.root, name))
+        return files
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'http' and scope['path'].startswith(self.prefix):
+            asset = self.files.get(scope['path'][len(self.prefix):])
+            if asset is not None and scope['method'] in ('GET', 'HEAD'):
+                await self.serve(asset, scope, send)
+                return
+        await self.application(scope, receive, send)
+
+    async def serve(self, asset, scope, send):
+        request_headers = {}
+        for key, value in scope['headers']:
+            request_headers[key.decode('latin-1').lower()] = value.decode('latin-1')
+
+        range_header = request_headers.get('range')
+        if range_header and request_headers.get('if-range', asset.identity.etag) != asset.identity.etag:
+            range_header = None
+
+        if range_header:
+            representation = asset.identity
+        else:
+            representation = asset.select(
+                request_headers.get('accept', ''),
+                request_headers.get('accept-encoding', ''),
+            )
+
+        headers = [
+            (b'cache-control', asset.cache_control.encode()),
+            (b'etag', representation.etag.encode()),
+            (b'accept-ranges', b'bytes'),
+        ]
+        if asset.vary:
+            headers.append((b'vary', asset.vary.encode()))
+
+        if etag_matches(representation.etag, request_headers.get('if-none-match', '')):
+            await send({'type': 'http.response.start', 'status': 304, 'headers': headers})
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+
+        status = 200
+        start, length = 0, representation.size
+        if range_header:
+            byte_range = self.parse_range(range_header, representation.size)
+            if byte_range is None:
+                headers.append((b'content-range', f'bytes */{representation.size}'.encode()))
+                headers.append((b'content-length', b'0'))
+                await send({'type': 'http.response.start', 'status': 416, 'headers': headers})
+                await send({'type': 'http.response.body', 'body': b''})
+                return
+            if byte_range != (0, representation.size):
+                status = 206
+                start, length = byte_range
+                end = start + length - 1
+                headers.append((b'content-range', f'bytes {start}-{end}/{representation.size}'.encode()))
+
+        headers.append((b'content-type', representation.content_type.encode()))
+        headers.append((b'content-length', str(length).encode()))
+        if representation.encoding:
+            headers.append((b'content-encoding', representation.encoding.encode()))
+
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        if scope['method'] == 'HEAD':
+            await send({'type': 'http.response.body', 'body': b''})
+            return
+
+        offset = start
+        remaining = length
+        while remaining > 0:
+            chunk = await read_chunk(representation.path, offset, min(CHUNK_SIZE, remaining))
+            offset += len(chunk)
+            remaining -= len(chunk)
+            await send({'type': 'http.response.body', 'body': chunk, 'more_body': remaining > 0})
+        if length == 0:
+            await send({'type': 'http.response.body', 'body': b''})
+
+    @staticmethod
+    def parse_range(header, size):
+        """
+        Returns (start, length) for a single satisfiable byte range, the
+        whole file for anything we don't support, or None if unsatisfiable.
+        """
+        match = RANGE_RE.match(header.strip())
+        if not match:
+            # Multiple or malformed ranges: send the full file instead.
+            return 0, size
+        first, last = match.groups()
+        if not first and not last:
+            return 0, size
+        if not first:
+            # Suffix range, e.g. bytes=-500 is the last 500 bytes.
+            length = min(int(last), size)
+            if length == 0:
+                return None
+            return size - length, length
+        start = int(first)
+        end = min(int(last), size - 1) if last else size - 1
+        if start >= size or end < start:
+            return None
+        return start, end - start + 1
+
+
+@sync_to_async(thread_sensitive=False)
+def read_chunk(path, offset, length):
+    with open(path, 'rb') as f:
+        f.seek(offset)
+        return f.read(length)
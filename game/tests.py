@@ -1,3 +1,269 @@
-from django.test import TestCase
+import asyncio
+import os
+import shutil
+import tempfile
+import threading
+from pathlib import Path
+from unittest import skipUnless
 
-# Create your tests here.
+from asgiref.testing import ApplicationCommunicator
+from django.core.files.storage import FileSystemStorage
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from . import startup
+from .models import GameRoom
+from .staticfiles import CompressedManifestStaticFilesStorage, Image, StaticFilesApplication
+
+
+async def fetch(application, path, headers=None):
+    """
+    Sends a single GET through an ASGI application and returns
+    (status, headers, body).
+    """
+    communicator = ApplicationCommunicator(application, {
+        'type': 'http',
+        'method': 'GET',
+        'path': path,
+        'headers': [(key.encode(), value.encode()) for key, value in (headers or {}).items()],
+    })
+    await communicator.send_input({'type': 'http.request', 'body': b''})
+    start = await communicator.receive_output()
+    body = b''
+    while True:
+        message = await communicator.receive_output()
+        body += message.get('body', b'')
+        if not message.get('more_body'):
+            break
+    response_headers = {key.decode(): value.decode() for key, value in start['headers']}
+    return start['status'], response_headers, body
+
+
+async def not_found(scope, receive, send):
+    await send({'type': 'http.response.start', 'status': 404, 'headers': []})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+class StaticFilesTests(SimpleTestCase):
+    CSS = b'body { color: #a0aec0; background-color: #1a202c; }\n' * 50
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        source = Path(tempfile.mkdtemp())
+        cls.root = tempfile.mkdtemp()
+        (source / 'style.css').write_bytes(cls.CSS)
+
+        storage = CompressedManifestStaticFilesStorage(location=cls.root)
+        shutil.copy(source / 'style.css', cls.root)
+        list(storage.post_process({'style.css': (FileSystemStorage(location=source), 'style.css')}))
+        shutil.rmtree(source)
+
+        cls.hashed_name = storage.stored_name('style.css')
+        cls.app = StaticFilesApplication(not_found, root=cls.root, prefix='/static/')
+
+    @classmethod
+    def tearDownClass(cls):
+        shutil.rmtree(cls.root)
+        super().tearDownClass()
+
+    def test_dry_run_keeps_manifest(self):
+        manifest = Path(self.root) / CompressedManifestStaticFilesStorage.manifest_name
+        before = manifest.read_bytes()
+
+        source = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, source)
+        (Path(source) / 'other.css').write_bytes(self.CSS)
+        storage = CompressedManifestStaticFilesStorage(location=self.root)
+        list(storage.post_process({'other.css': (FileSystemStorage(location=source), 'other.css')}, dry_run=True))
+
+        self.assertEqual(manifest.read_bytes(), before)
+
+    def test_stale_variants_are_removed(self):
+        root = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, root)
+        storage = CompressedManifestStaticFilesStorage(location=root)
+        (Path(root) / 'tiny.css').write_bytes(self.CSS)
+        self.assertEqual(storage.build_variants('tiny.css')[0], 'tiny.css.gz')
+
+        # Too small to compress: the earlier .gz must not be served for it.
+        (Path(root) / 'tiny.css').write_bytes(b'a{}')
+        self.assertEqual(storage.build_variants('tiny.css'), [])
+        self.assertEqual(os.listdir(root), ['tiny.css'])
+
+    def test_parse_range(self):
+        parse_range = StaticFilesApplication.parse_range
+        self.assertEqual(parse_range('bytes=0-9', 100), (0, 10))
+        self.assertEqual(parse_range('bytes=90-', 100), (90, 10))
+        self.assertEqual(parse_range('bytes=-5', 100), (95, 5))
+        self.assertEqual(parse_range('bytes=-500', 100), (0, 100))
+        self.assertEqual(parse_range('bytes=50-500', 100), (50, 50))
+        self.assertIsNone(parse_range('bytes=100-', 100))
+        self.assertIsNone(parse_range('bytes=9-5', 100))
+        self.assertIsNone(parse_range('bytes=-0', 100))
+        # Multiple or malformed ranges fall back to the whole file.
+        self.assertEqual(parse_range('bytes=0-1, 5-6', 100), (0, 100))
+        self.assertEqual(parse_range('items=0-1', 100), (0, 100))
+
+    def test_select(self):
+        asset = self.app.files[self.hashed_name]
+        # brotli is optional, so the br variant may not have been built.
+        best = 'br' if 'br' in asset.variants else 'gzip'
+        self.assertEqual(asset.select('', 'gzip, deflate, br').encoding, best)
+        self.assertEqual(asset.select('', 'gzip, br;q=0.5').encoding, 'gzip')
+        self.assertEqual(asset.select('', 'gzip;q=0, br;q=0').encoding, None)
+        self.assertEqual(asset.select('', 'br;q=0, *').encoding, 'gzip')
+        self.assertEqual(asset.select('', '').encoding, None)
+
+        asset.variants['webp'] = asset.identity._replace(content_type='image/webp')
+        try:
+            self.assertEqual(asset.select('image/webp,*/*', '').content_type, 'image/webp')
+            self.assertEqual(asset.select('image/webp;q=0,*/*', '').content_type, 'text/css')
+            self.assertEqual(asset.select('image/webp;q=0.1, text/css', '').content_type, 'text/css')
+            self.assertEqual(asset.select('image/webp;q=0.1, text/*;q=0.5', '').content_type, 'text/css')
+            self.assertEqual(asset.select('image/webp, text/css;q=0.5', '').content_type, 'image/webp')
+        finally:
+            del asset.variants['webp']
+
+    async def test_hashed_file_is_immutable_and_compressed(self):
+        status, headers, body = await fetch(
+            self.app, f'/static/{self.hashed_name}', {'accept-encoding': 'gzip'},
+        )
+        self.assertEqual(status, 200)
+        self.assertIn('immutable', headers['cache-control'])
+        self.assertEqual(headers['content-encoding'], 'gzip')
+        self.assertLess(len(body), len(self.CSS))
+
+        status, headers, _ = await fetch(self.app, '/static/style.css')
+        self.assertEqual(headers['cache-control'], 'no-cache')
+        self.assertNotIn('content-encoding', headers)
+
+    async def test_range(self):
+        status, headers, body = await fetch(
+            self.app, f'/static/{self.hashed_name}', {'range': 'bytes=0-9', 'accept-encoding': 'gzip'},
+        )
+        self.assertEqual(status, 206)
+        self.assertEqual(headers['content-range'], f'bytes 0-9/{len(self.CSS)}')
+        self.assertNotIn('content-encoding', headers)
+        self.assertEqual(body, self.CSS[:10])
+
+        status, headers, body = await fetch(
+            self.app, f'/static/{self.hashed_name}', {'range': f'bytes={len(self.CSS)}-'},
+        )
+        self.assertEqual(status, 416)
+        self.assertEqual(headers['content-range'], f'bytes */{len(self.CSS)}')
+        self.assertEqual(body, b'')
+
+    async def test_if_none_match(self):
+        _, headers, _ = await fetch(self.app, f'/static/{self.hashed_name}')
+        etag = headers['etag']
+
+        for if_none_match in (etag, f'W/{etag}', f'"other", {etag}', '*'):
+            status, _, body = await fetch(
+                self.app, f'/static/{self.hashed_name}', {'if-none-match': if_none_match},
+            )
+            self.assertEqual(status, 304, if_none_match)
+            self.assertEqual(body, b'')
+
+        status, _, _ = await fetch(self.app, f'/static/{self.hashed_name}', {'if-none-match': '"other"'})
+        self.assertEqual(status, 200)
+
+    async def test_unknown_file_falls_through(self):
+        status, _, _ = await fetch(self.app, '/static/missing.css')
+        self.assertEqual(status, 404)
+
+
+@skipUnless(Image is not None, "Pillow is not installed")
+class ImageVariantTests(SimpleTestCase):
+    async def test_webp_is_built_and_served(self):
+        source, root = tempfile.mkdtemp(), tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, source)
+        self.addCleanup(shutil.rmtree, root)
+        Image.radial_gradient('L').convert('RGB').resize((300, 300)).save(Path(source) / 'bg.png')
+        shutil.copy(Path(source) / 'bg.png', root)
+
+        storage = CompressedManifestStaticFilesStorage(location=root)
+        list(storage.post_process({'bg.png': (FileSystemStorage(location=source), 'bg.png')}))
+        hashed_name = storage.stored_name('bg.png')
+        self.assertTrue((Path(root) / f'{hashed_name}.webp').exists())
+
+        app = StaticFilesApplication(not_found, root=root, prefix='/static/')
+        status, headers, body = await fetch(app, f'/static/{hashed_name}', {'accept': 'image/webp,image/*'})
+        self.assertEqual(status, 200)
+        self.assertEqual(headers['content-type'], 'image/webp')
+        self.assertEqual(headers['vary'], 'Accept')
+        self.assertEqual(body[8:12], b'WEBP')
+
+        status, headers, _ = await fetch(app, f'/static/{hashed_name}', {'accept': 'image/png'})
+        self.assertEqual(headers['content-type'], 'image/png')
+
+
+class ViewTests(TestCase):
+    def test_room_page_renders_without_collectstatic(self):
+        room = GameRoom.objects.create()
+        with tempfile.TemporaryDirectory() as static_root, override_settings(STATIC_ROOT=static_root):
+            response = self.client.get(f'/game/{room.room_code}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '/static/game/style.css"')
+
+
+class StartupTests(TestCase):
+    def setUp(self):
+        startup._ready = False
+        startup._warm_up_task = None
+
+    def tearDown(self):
+        startup._ready = False
+        startup._warm_up_task = None
+
+    async def test_ready_after_warm_up(self):
+        response = await self.async_client.get('/ready/')
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response.json(), {'ready': False})
+
+        await startup.start_warm_up()
+
+        response = await self.async_client.get('/ready/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {'ready': True})
+
+    async def test_lazy_application_builds_once(self):
+        calls = []
+
+        def factory():
+            calls.append(1)
+            return not_found
+
+        application = startup.LazyApplication(factory)
+        try:
+            self.assertEqual(calls, [])
+            application.load()
+            status, _, _ = await fetch(application, '/')
+            self.assertEqual(status, 404)
+            status, _, _ = await fetch(application, '/')
+            self.assertEqual(calls, [1])
+        finally:
+            startup._lazy_applications.remove(application)
+
+    async def test_lazy_application_does_not_block_event_loop(self):
+        started, loop_ran = threading.Event(), threading.Event()
+
+        def factory():
+            started.set()
+            # Only succeeds if the event loop is free to set the flag while
+            # the factory is running.
+            self.assertTrue(loop_ran.wait(timeout=2))
+            return not_found
+
+        async def poke_loop():
+            while not started.is_set():
+                await asyncio.sleep(0.01)
+            loop_ran.set()
+
+        application = startup.LazyApplication(factory)
+        try:
+            poker = asyncio.ensure_future(poke_loop())
+            status, _, _ = await fetch(application, '/')
+            self.assertEqual(status, 404)
+            await poker
+        finally:
+            startup._lazy_applications.remove(application)
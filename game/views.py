@@ -1,4 +1,6 @@
+from django.http import JsonResponse
 from django.shortcuts import render, redirect, get_object_or_404
+from . import startup
 from .models import GameRoom
 
 def create_or_join_room(request):
@@ -23,3 +25,12 @@ def game_room(request, room_code):
     return render(request, 'game/room.html', {
         'room_code': room.room_code
     })
+
+
+def ready(request):
+    """
+    Readiness probe: 503 until this worker has finished warming up.
+    """
+    if startup.is_ready():
+        return JsonResponse({'ready': True})
+    return JsonResponse({'ready': False}, status=503)
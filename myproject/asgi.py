@@ -6,20 +6,38 @@ from django.core.asgi import get_asgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'myproject.settings')
 django_asgi_app = get_asgi_application()
 
+from django.conf import settings
 from channels.routing import ProtocolTypeRouter, URLRouter
-from channels.auth import AuthMiddlewareStack
-import game.routing
+from game.startup import LazyApplication, WarmUpApplication
+from game.staticfiles import StaticFilesApplication
 
 
-application = ProtocolTypeRouter({
-    # Django's ASGI application to handle traditional HTTP requests
-    "http": django_asgi_app,
+def websocket_application():
+    # Channels' auth stack and the game consumer are only needed for the
+    # WebSocket route, so they are imported on first use or during warm-up.
+    from channels.auth import AuthMiddlewareStack
+    import game.routing
 
-    # WebSocket handler
-    "websocket": AuthMiddlewareStack(
+    return AuthMiddlewareStack(
         URLRouter(
             game.routing.websocket_urlpatterns
         )
-    ),
-})
+    )
+
+
+# In production, serve collected static files (hashed names, precompressed
+# variants, immutable caching) in front of Django. This requires running
+# `manage.py collectstatic` first. During development (DEBUG = True) the
+# files are served live from STATICFILES_DIRS by myproject/urls.py instead.
+http_application = django_asgi_app
+if not settings.DEBUG:
+    http_application = StaticFilesApplication(django_asgi_app)
 
+
+application = WarmUpApplication(ProtocolTypeRouter({
+    # Django's ASGI application to handle traditional HTTP requests
+    "http": http_application,
+
+    # WebSocket handler
+    "websocket": LazyApplication(websocket_application),
+}))
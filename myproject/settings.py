@@ -123,6 +123,21 @@ STATIC_URL = 'static/'
 STATICFILES_DIRS = [
     os.path.join(BASE_DIR, 'game/static'),
 ]
+# collectstatic writes hashed filenames plus .gz/.br/.webp variants here,
+# which myproject.asgi serves with long-lived cache headers when DEBUG is off.
+# With DEBUG = False, run `python manage.py collectstatic` before starting the
+# server: files missing from staticfiles.json are linked by their unhashed
+# name and don't get immutable caching.
+STATIC_ROOT = BASE_DIR / 'staticfiles'
+
+STORAGES = {
+    "default": {
+        "BACKEND": "django.core.files.storage.FileSystemStorage",
+    },
+    "staticfiles": {
+        "BACKEND": "game.staticfiles.CompressedManifestStaticFilesStorage",
+    },
+}
 
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field